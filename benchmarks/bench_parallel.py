@@ -0,0 +1,69 @@
+"""Сравнение последовательного и параллельного хода в мире из 200 цивилизаций.
+
+При нынешней стоимости хода одной цивилизации параллельный режим медленнее:
+пересылка состояния в рабочие процессы дороже самой работы.
+
+Запуск: python benchmarks/bench_parallel.py [--civs 200] [--turns 20] [--workers 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cvlz
+
+
+def build_game(workers, civs, seed=42):
+    random.seed(seed)
+    game = cvlz.Game(workers=workers)
+    game.world = cvlz.WorldMap(60, 60)
+    game.player_civ = cvlz.Civilization("Рим", "Цезарь")
+    capital = cvlz.City("Рим", 5, 5, game.player_civ)
+    game.player_civ.add_city(capital)
+    game.world.cities.append(capital)
+    capital.set_production(cvlz.UnitType.SCOUT)
+    for i in range(civs):
+        civ = cvlz.Civilization(f"AI {i}", "Лидер")
+        for j in range(3):
+            city = cvlz.City(f"Город {i}-{j}", random.randrange(60), random.randrange(60), civ)
+            civ.add_city(city)
+            game.world.cities.append(city)
+        for _ in range(5):
+            unit = cvlz.Unit(cvlz.UnitType.WARRIOR, random.randrange(60), random.randrange(60), civ)
+            civ.units.append(unit)
+            game.world.units.append(unit)
+        game.ai_civs.append(civ)
+    return game
+
+
+def run(game, turns):
+    start = time.perf_counter()
+    for _ in range(turns):
+        game.process_turn()
+    elapsed = time.perf_counter() - start
+    game.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--civs", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"Цивилизаций: {args.civs}, ходов: {args.turns}, ядер: {os.cpu_count()}")
+
+    serial = run(build_game(0, args.civs), args.turns)
+    print(f"последовательно:  {serial * 1000:8.1f} мс")
+
+    parallel = run(build_game(args.workers, args.civs), args.turns)
+    print(f"workers={args.workers}:        {parallel * 1000:8.1f} мс")
+    print(f"накладные расходы пула за ход: {(parallel - serial) / args.turns * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import random
 import json
 import os
+import sys
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 class TerrainType(Enum):
     PLAINS = "Равнины"
@@ -42,6 +47,155 @@ class Technology(Enum):
     HORSEBACK_RIDING = "Верховая езда"
     MATHEMATICS = "Математика"
 
+class EventType(Enum):
+    UNIT_BUILT = "unit_built"
+    TECH_RESEARCHED = "tech_researched"
+    VICTORY = "victory"
+    DEFEAT = "defeat"
+
+class Event:
+    __slots__ = ("type", "turn", "data")
+
+    def __init__(self, event_type: EventType, turn: int, data: Dict[str, Any]):
+        self.type = event_type
+        self.turn = turn
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'type': self.type.value, 'turn': self.turn, 'data': self.data}
+
+    def message(self) -> str:
+        return EVENT_MESSAGES[self.type].format(**self.data)
+
+class EventSink:
+    # Базовый приемник: по умолчанию отбрасывает события
+    def emit(self, event: Event):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+class BufferedSink(EventSink):
+    # Копит события и отдает их пачкой в write_batch() при flush()
+    def __init__(self):
+        self.pending: List[Event] = []
+
+    def emit(self, event: Event):
+        self.pending.append(event)
+
+    def flush(self):
+        if self.pending:
+            batch, self.pending = self.pending, []
+            self.write_batch(batch)
+
+    def write_batch(self, batch: List[Event]):
+        pass
+
+class ConsoleSink(BufferedSink):
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream
+
+    def write_batch(self, batch: List[Event]):
+        stream = self.stream or sys.stdout
+        stream.write("".join(event.message() + "\n" for event in batch))
+        stream.flush()
+
+class JsonlFileSink(BufferedSink):
+    # flush() в конце хода только передает пачку в буфер файла;
+    # на диск данные уходят при заполнении буфера или при close()
+    def __init__(self, path: str, batch_size: int = 256):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def emit(self, event: Event):
+        self.pending.append(event)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def write_batch(self, batch: List[Event]):
+        self.file.write("".join(json.dumps(event.to_dict(), ensure_ascii=False) + "\n" for event in batch))
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+class RingBufferSink(EventSink):
+    # Хранит последние capacity событий в памяти (None - без ограничения)
+    def __init__(self, capacity: Optional[int] = 1000):
+        self.events = deque(maxlen=capacity)
+
+    def emit(self, event: Event):
+        self.events.append(event)
+
+class NullSink(EventSink):
+    pass
+
+class EventBus:
+    def __init__(self):
+        self.turn = 0
+        self.sinks: List[EventSink] = []
+        # приемник: типы событий (None - все типы)
+        self.subscriptions: Dict[EventSink, Optional[frozenset]] = {}
+        # Для каждого типа события заранее храним список получателей
+        self.routes: Dict[EventType, List[EventSink]] = {}
+
+    def subscribe(self, sink: EventSink, event_types: Optional[Iterable[EventType]] = None) -> EventSink:
+        types = frozenset(event_types) if event_types is not None else None
+        # Повторная подписка расширяет фильтр, а не дублирует доставку
+        if sink in self.subscriptions:
+            previous = self.subscriptions[sink]
+            types = None if previous is None or types is None else previous | types
+        self.subscriptions[sink] = types
+        self._rebuild_routes()
+        return sink
+
+    def unsubscribe(self, sink: EventSink):
+        if sink in self.subscriptions:
+            sink.flush()
+            del self.subscriptions[sink]
+            self._rebuild_routes()
+
+    def _rebuild_routes(self):
+        self.routes = {}
+        for sink, types in self.subscriptions.items():
+            for event_type in EventType:
+                if types is None or event_type in types:
+                    self.routes.setdefault(event_type, []).append(sink)
+        self.sinks = list(self.subscriptions)
+
+    def wants(self, event_type: EventType) -> bool:
+        return event_type in self.routes
+
+    def publish(self, event_type: EventType, **data):
+        sinks = self.routes.get(event_type)
+        if not sinks:
+            return
+        event = Event(event_type, self.turn, data)
+        for sink in sinks:
+            sink.emit(event)
+            
+    def dispatch(self, event: Event):
+        # Повторная публикация уже готового события (например, из другого процесса)
+        for sink in self.routes.get(event.type, ()):
+            sink.emit(event)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        # Закрытые приемники отписываются, чтобы последующие события их не трогали
+        for sink in self.sinks:
+            sink.close()
+        self.subscriptions = {}
+        self._rebuild_routes()
+
 class Civilization:
     def __init__(self, name: str, leader: str):
         self.name = name
@@ -77,6 +231,52 @@ class Civilization:
             self.technology[self.active_research] = True
             self.discovered_techs.append(self.active_research)
             self.active_research = None
+            
+    def process_turn(self, events: Optional['EventBus'] = None):
+        # Ход цивилизации игрока: города, ресурсы, исследования, ходы юнитов
+        for city in self.cities:
+            city.process_turn(events)
+            
+        self.calculate_yields()
+        self.gold += self.gold_per_turn
+        
+        if self.active_research:
+            tech_cost = TECH_COSTS[self.active_research]
+            if self.science_per_turn >= tech_cost:
+                self.complete_research()
+                if events is not None and events.wants(EventType.TECH_RESEARCHED):
+                    events.publish(EventType.TECH_RESEARCHED, tech=self.discovered_techs[-1].value)
+                    
+        for unit in self.units:
+            unit.reset_moves()
+            
+    def develop_cities(self):
+        # Ход AI: города только обрабатывают клетки
+        for city in self.cities:
+            city.work_tile()
+            
+    def merge_state(self, other: 'Civilization'):
+        # Переносит результат хода, посчитанного на копии в другом процессе.
+        # Копируются все поля, кроме имен и ссылок на общие объекты.
+        # Ход может только добавлять юниты в конец списка, но не удалять их
+        if len(other.cities) != len(self.cities):
+            raise RuntimeError(f"Ход цивилизации {self.name} изменил список городов")
+        if len(other.units) < len(self.units):
+            raise RuntimeError(f"Ход цивилизации {self.name} удалил юниты")
+        copy_turn_fields(other, self, CIV_SHARED_FIELDS)
+        for city, processed in zip(self.cities, other.cities):
+            copy_turn_fields(processed, city, CITY_SHARED_FIELDS)
+        for unit, processed in zip(self.units, other.units):
+            copy_turn_fields(processed, unit, UNIT_SHARED_FIELDS)
+        for processed in other.units[len(self.units):]:
+            unit = Unit(processed.type, processed.x, processed.y, self)
+            copy_turn_fields(processed, unit, UNIT_SHARED_FIELDS)
+            self.units.append(unit)
+
+def copy_turn_fields(source, target, shared_fields: Tuple[str, ...]):
+    for name, value in vars(source).items():
+        if name not in shared_fields:
+            setattr(target, name, value)
 
 class City:
     def __init__(self, name: str, x: int, y: int, civilization: Civilization):
@@ -121,7 +321,7 @@ class City:
         self.current_production = unit_type
         self.production_progress = 0
         
-    def process_turn(self):
+    def process_turn(self, events: Optional[EventBus] = None):
         self.work_tile()
         
         if self.current_production:
@@ -132,7 +332,8 @@ class City:
                 self.production_progress = 0
                 unit = Unit(self.current_production, self.x, self.y, self.civilization)
                 self.civilization.units.append(unit)
-                print(f"В городе {self.name} построен {unit.type.value}!")
+                if events is not None and events.wants(EventType.UNIT_BUILT):
+                    events.publish(EventType.UNIT_BUILT, city=self.name, unit=unit.type.value)
                 self.current_production = None
 
 class Unit:
@@ -208,6 +409,19 @@ class WorldMap:
         print("=" * 80)
 
 # Константы
+# Поля, которые не переносятся из рабочих процессов: имена, координаты городов
+# и ссылки на общие объекты, которые в процессе существуют только как копии
+CIV_SHARED_FIELDS = ('name', 'leader', 'cities', 'units', 'diplomacy')
+CITY_SHARED_FIELDS = ('name', 'x', 'y', 'civilization')
+UNIT_SHARED_FIELDS = ('civilization',)
+
+EVENT_MESSAGES = {
+    EventType.UNIT_BUILT: "В городе {city} построен {unit}!",
+    EventType.TECH_RESEARCHED: "\nИсследована новая технология: {tech}!",
+    EventType.VICTORY: "\n🎉 ПОБЕДА! Вы основали великую империю!",
+    EventType.DEFEAT: "\n💀 ПОРАЖЕНИЕ! Вы потеряли все города!"
+}
+
 UNIT_COSTS = {
     UnitType.SETTLER: 100,
     UnitType.WARRIOR: 40,
@@ -262,13 +476,34 @@ TECH_REQUIREMENTS = {
     Technology.MATHEMATICS: [Technology.WRITING]
 }
 
+def process_civ_shard(shard: List[Tuple[Civilization, bool]], turn: int,
+                      record_events: bool) -> List[Tuple[Civilization, List[Event]]]:
+    # Выполняется в рабочем процессе: считает ход для группы цивилизаций
+    results = []
+    for civ, is_player in shard:
+        events = EventBus()
+        events.turn = turn
+        recorder = events.subscribe(RingBufferSink(None)) if record_events else None
+        if is_player:
+            civ.process_turn(events)
+        else:
+            civ.develop_cities()
+        results.append((civ, list(recorder.events) if recorder else []))
+    return results
+
 class Game:
-    def __init__(self):
+    def __init__(self, workers: int = 0):
         self.world = WorldMap()
         self.player_civ = None
         self.ai_civs: List[Civilization] = []
         self.turn = 0
         self.game_over = False
+        self.events = EventBus()
+        # workers > 1 явно включает обработку хода в пуле процессов.
+        # При нынешней стоимости хода одной цивилизации пересылка состояния
+        # обходится дороже самой работы, поэтому этот режим медленнее обычного
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
         
     def setup_game(self):
         print("ДОБРО ПОЖАЛОВАТЬ В ЦИВИЛИЗАЦИЮ!")
@@ -576,56 +811,90 @@ class Game:
     
     def process_turn(self):
         self.turn += 1
+        self.events.turn = self.turn
         
-        # Обновляем города игрока
-        for city in self.player_civ.cities:
-            city.process_turn()
-        
-        # Обновляем ресурсы цивилизации
-        self.player_civ.calculate_yields()
-        self.player_civ.gold += self.player_civ.gold_per_turn
-        
-        # Исследования
-        if self.player_civ.active_research:
-            tech_cost = TECH_COSTS[self.player_civ.active_research]
-            if self.player_civ.science_per_turn >= tech_cost:
-                self.player_civ.complete_research()
-                print(f"\nИсследована новая технология: {self.player_civ.discovered_techs[-1].value}!")
-        
-        # Восстанавливаем ходы юнитов
-        for unit in self.player_civ.units:
-            unit.reset_moves()
-        
-        # Ход AI
-        self.ai_turn()
+        if self.workers > 1 and self.process_civs_parallel():
+            # Перемещения юнитов AI используют общий генератор случайных чисел,
+            # поэтому выполняются здесь по порядку цивилизаций, как в ai_turn
+            for civ in self.ai_civs:
+                self.move_ai_units(civ)
+        else:
+            # Ход игрока: города, ресурсы, исследования, ходы юнитов
+            self.player_civ.process_turn(self.events)
+            
+            # Ход AI
+            self.ai_turn()
         
         # Проверка условий победы
         self.check_victory()
+        
+        # Отдаем накопленные за ход события приемникам
+        self.events.flush()
+    
+    def process_civs_parallel(self) -> bool:
+        # Возвращает False, если пул сломался и ход нужно выполнить последовательно
+        tasks = [(self.player_civ, True)] + [(civ, False) for civ in self.ai_civs]
+        shard_size = -(-len(tasks) // self.workers)
+        shards = [tasks[i:i + shard_size] for i in range(0, len(tasks), shard_size)]
+        
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        record_events = bool(self.events.routes)
+        futures = [self.executor.submit(process_civ_shard, shard, self.turn, record_events)
+                   for shard in shards]
+        
+        # Сначала дожидаемся всех результатов, чтобы ошибка в любой группе
+        # не оставила игру наполовину обновленной
+        try:
+            results = [future.result() for future in futures]
+        except BrokenProcessPool:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.workers = 0
+            warnings.warn("Пул процессов завершился аварийно; ходы выполняются последовательно",
+                          RuntimeWarning)
+            return False
+        
+        # Результаты применяем строго в порядке цивилизаций
+        for shard, shard_results in zip(shards, results):
+            for (civ, _), (processed, events) in zip(shard, shard_results):
+                civ.merge_state(processed)
+                for event in events:
+                    self.events.dispatch(event)
+        return True
     
     def ai_turn(self):
         for civ in self.ai_civs:
             # AI развивает города
-            for city in civ.cities:
-                city.work_tile()
+            civ.develop_cities()
                 
             # AI двигает юниты
-            for unit in civ.units:
-                if unit.moves > 0:
-                    dx = random.choice([-1, 0, 1])
-                    dy = random.choice([-1, 0, 1])
-                    new_x = max(0, min(self.world.width - 1, unit.x + dx))
-                    new_y = max(0, min(self.world.height - 1, unit.y + dy))
-                    unit.x = new_x
-                    unit.y = new_y
-                    unit.moves -= 1
+            self.move_ai_units(civ)
+    
+    def move_ai_units(self, civ: Civilization):
+        for unit in civ.units:
+            if unit.moves > 0:
+                dx = random.choice([-1, 0, 1])
+                dy = random.choice([-1, 0, 1])
+                new_x = max(0, min(self.world.width - 1, unit.x + dx))
+                new_y = max(0, min(self.world.height - 1, unit.y + dy))
+                unit.x = new_x
+                unit.y = new_y
+                unit.moves -= 1
     
     def check_victory(self):
         if len(self.player_civ.cities) >= 5:
-            print("\n🎉 ПОБЕДА! Вы основали великую империю!")
+            self.events.publish(EventType.VICTORY, civ=self.player_civ.name)
             self.game_over = True
         elif len(self.player_civ.cities) == 0:
-            print("\n💀 ПОРАЖЕНИЕ! Вы потеряли все города!")
+            self.events.publish(EventType.DEFEAT, civ=self.player_civ.name)
             self.game_over = True
+            
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.events.close()
     
     def save_game(self):
         data = {
@@ -679,8 +948,12 @@ class Game:
 
 def main():
     game = Game()
+    game.events.subscribe(ConsoleSink())
     game.setup_game()
-    game.main_menu()
+    try:
+        game.main_menu()
+    finally:
+        game.close()
 
 if __name__ == "__main__":
     main()
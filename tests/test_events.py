@@ -0,0 +1,126 @@
+import io
+import json
+
+from cvlz import (City, Civilization, ConsoleSink, EventBus, EventType, JsonlFileSink,
+                  NullSink, RingBufferSink, TerrainType, UnitType)
+
+
+def test_publish_without_subscribers_is_noop():
+    bus = EventBus()
+    assert not bus.wants(EventType.UNIT_BUILT)
+    bus.publish(EventType.UNIT_BUILT, city="A", unit="Воин")
+    bus.flush()
+    assert bus.routes == {}
+
+
+def test_null_sink_accepts_events():
+    bus = EventBus()
+    bus.subscribe(NullSink())
+    bus.publish(EventType.VICTORY, civ="Рим")
+    bus.flush()
+    bus.close()
+
+
+def test_filter_by_event_type():
+    bus = EventBus()
+    ring = bus.subscribe(RingBufferSink(), [EventType.UNIT_BUILT])
+    bus.publish(EventType.UNIT_BUILT, city="A", unit="Воин")
+    bus.publish(EventType.VICTORY, civ="Рим")
+    assert [e.type for e in ring.events] == [EventType.UNIT_BUILT]
+    assert not bus.wants(EventType.VICTORY)
+
+
+def test_resubscribe_merges_filters_without_duplicates():
+    bus = EventBus()
+    stream = io.StringIO()
+    sink = ConsoleSink(stream)
+    bus.subscribe(sink, [EventType.UNIT_BUILT])
+    bus.subscribe(sink, [EventType.UNIT_BUILT, EventType.VICTORY])
+    bus.publish(EventType.UNIT_BUILT, city="A", unit="Воин")
+    bus.publish(EventType.VICTORY, civ="Рим")
+    bus.flush()
+    assert stream.getvalue().count("построен") == 1
+    assert "ПОБЕДА" in stream.getvalue()
+
+    bus.subscribe(sink)
+    assert bus.subscriptions[sink] is None
+    bus.subscribe(sink, [EventType.DEFEAT])
+    assert bus.subscriptions[sink] is None
+
+
+def test_unsubscribe_flushes_pending_events():
+    bus = EventBus()
+    stream = io.StringIO()
+    sink = bus.subscribe(ConsoleSink(stream))
+    bus.publish(EventType.UNIT_BUILT, city="A", unit="Воин")
+    bus.unsubscribe(sink)
+    assert "В городе A построен Воин!" in stream.getvalue()
+    assert sink.pending == []
+    bus.publish(EventType.UNIT_BUILT, city="B", unit="Воин")
+    bus.flush()
+    assert "B" not in stream.getvalue()
+
+
+def test_ring_buffer_capacity():
+    bus = EventBus()
+    ring = bus.subscribe(RingBufferSink(3))
+    for i in range(5):
+        bus.publish(EventType.UNIT_BUILT, city=str(i), unit="Воин")
+    assert [e.data["city"] for e in ring.events] == ["2", "3", "4"]
+
+
+def test_jsonl_sink_flushes_by_batch_size_and_on_close(tmp_path):
+    path = tmp_path / "events.jsonl"
+    bus = EventBus()
+    bus.turn = 7
+    sink = bus.subscribe(JsonlFileSink(str(path), batch_size=2))
+    bus.publish(EventType.UNIT_BUILT, city="A", unit="Воин")
+    assert len(sink.pending) == 1
+    bus.publish(EventType.UNIT_BUILT, city="B", unit="Воин")
+    assert sink.pending == []
+    bus.publish(EventType.VICTORY, civ="Рим")
+    # Конец хода не форсирует запись на диск
+    bus.flush()
+    assert sink.pending == []
+    assert path.read_text(encoding="utf-8") == ""
+    bus.close()
+    assert sink.file.closed
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines == [
+        {"type": "unit_built", "turn": 7, "data": {"city": "A", "unit": "Воин"}},
+        {"type": "unit_built", "turn": 7, "data": {"city": "B", "unit": "Воин"}},
+        {"type": "victory", "turn": 7, "data": {"civ": "Рим"}},
+    ]
+
+
+def test_payload_cannot_override_envelope():
+    bus = EventBus()
+    bus.turn = 3
+    ring = bus.subscribe(RingBufferSink())
+    bus.publish(EventType.VICTORY, civ="Рим", turn=99, type="x")
+    assert ring.events[0].to_dict() == {
+        "type": "victory", "turn": 3, "data": {"civ": "Рим", "turn": 99, "type": "x"}}
+
+
+def test_publish_after_close_is_ignored(tmp_path):
+    bus = EventBus()
+    sink = bus.subscribe(JsonlFileSink(str(tmp_path / "events.jsonl")))
+    bus.close()
+    assert bus.routes == {} and bus.sinks == []
+    bus.publish(EventType.UNIT_BUILT, city="A", unit="Воин")
+    bus.flush()
+    bus.close()
+    assert sink.pending == []
+
+
+def test_city_publishes_unit_built():
+    civ = Civilization("Рим", "Цезарь")
+    city = City("Рим", 0, 0, civ)
+    city.terrain = TerrainType.HILLS
+    city.production = 100
+    city.set_production(UnitType.SCOUT)
+    bus = EventBus()
+    ring = bus.subscribe(RingBufferSink())
+    city.process_turn(bus)
+    assert [e.data for e in ring.events] == [{"city": "Рим", "unit": UnitType.SCOUT.value}]
+    assert len(civ.units) == 1
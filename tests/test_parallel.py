@@ -0,0 +1,148 @@
+import multiprocessing
+import random
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import cvlz
+from cvlz import City, Civilization, Game, RingBufferSink, TerrainType, Unit, UnitType, WorldMap
+
+
+def build_game(workers, civs=12, seed=7):
+    random.seed(seed)
+    game = Game(workers=workers)
+    game.world = WorldMap(30, 30)
+    game.player_civ = Civilization("Рим", "Цезарь")
+    capital = City("Рим", 5, 5, game.player_civ)
+    capital.terrain = TerrainType.HILLS
+    game.player_civ.add_city(capital)
+    game.world.cities.append(capital)
+    capital.set_production(UnitType.SCOUT)
+    game.player_civ.research_tech(cvlz.Technology.MINING)
+    for i in range(civs):
+        civ = Civilization(f"AI {i}", "Лидер")
+        for j in range(3):
+            city = City(f"Город {i}-{j}", random.randrange(30), random.randrange(30), civ)
+            civ.add_city(city)
+            game.world.cities.append(city)
+        for _ in range(5):
+            unit = Unit(UnitType.WARRIOR, random.randrange(30), random.randrange(30), civ)
+            civ.units.append(unit)
+            game.world.units.append(unit)
+        game.ai_civs.append(civ)
+    return game
+
+
+def snapshot(obj, *skip):
+    return {name: value for name, value in vars(obj).items() if name not in skip}
+
+
+def play(game, turns=15):
+    ring = game.events.subscribe(RingBufferSink(None))
+    for _ in range(turns):
+        game.process_turn()
+        capital = game.player_civ.cities[0]
+        if capital.current_production is None:
+            capital.set_production(UnitType.SCOUT)
+    game.close()
+    civs = [game.player_civ] + game.ai_civs
+    # Сравниваем все поля объектов, чтобы новое поле, которое меняет ход,
+    # не могло разойтись между режимами незамеченным
+    return {
+        'civs': [snapshot(c, 'cities', 'units') for c in civs],
+        'cities': [[snapshot(x, 'civilization') for x in c.cities] for c in civs],
+        'units': [[snapshot(u, 'civilization') for u in c.units] for c in civs],
+        'events': [e.to_dict() for e in ring.events],
+        'random': random.getstate(),
+    }
+
+
+def test_parallel_turns_match_serial_for_same_seed():
+    serial = play(build_game(0))
+    game = build_game(3)
+    parallel = play(game)
+
+    assert game.workers == 3
+    assert parallel == serial
+    assert serial['events']
+    assert all(u.civilization is game.player_civ for u in game.player_civ.units)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason="рабочие процессы должны унаследовать подмененный метод")
+def test_new_turn_field_reaches_parallel_results(monkeypatch):
+    work_tile = City.work_tile
+
+    def work_tile_with_culture(self):
+        work_tile(self)
+        self.culture = getattr(self, 'culture', 0) + 1
+
+    monkeypatch.setattr(City, 'work_tile', work_tile_with_culture)
+    serial = play(build_game(0))
+    parallel = play(build_game(3))
+    assert serial['cities'][1][0]['culture'] == 15
+    assert parallel == serial
+
+
+class BrokenExecutor:
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_broken_pool_falls_back_to_serial():
+    serial = play(build_game(0))
+
+    game = build_game(3)
+    game.executor = BrokenExecutor()
+    with pytest.warns(RuntimeWarning):
+        parallel = play(game)
+
+    assert game.workers == 0
+    assert game.executor is None
+    assert parallel == serial
+
+
+def test_merge_state_copies_turn_fields_only():
+    civ = Civilization("Рим", "Цезарь")
+    city = City("Рим", 0, 0, civ)
+    civ.add_city(city)
+    civ.units.append(Unit(UnitType.WARRIOR, 0, 0, civ))
+
+    other = Civilization("Рим", "Цезарь")
+    processed = City("Рим", 9, 9, other)
+    processed.food = 42
+    other.add_city(processed)
+    other.units.append(Unit(UnitType.WARRIOR, 3, 4, other))
+    other.units.append(Unit(UnitType.SCOUT, 0, 0, other))
+    other.gold = 500
+    other.diplomacy["Египет"] = "Война"
+
+    civ.merge_state(other)
+    assert civ.gold == 500
+    assert civ.diplomacy == {}
+    assert city.food == 42
+    assert (city.x, city.y) == (0, 0)
+    assert city.civilization is civ
+    assert (civ.units[0].x, civ.units[0].y) == (3, 4)
+    assert [u.civilization for u in civ.units] == [civ, civ]
+    assert civ.units[1].type == UnitType.SCOUT
+
+
+def test_merge_state_rejects_removed_units():
+    civ = Civilization("Рим", "Цезарь")
+    civ.units.append(Unit(UnitType.WARRIOR, 0, 0, civ))
+    with pytest.raises(RuntimeError):
+        civ.merge_state(Civilization("Рим", "Цезарь"))
+
+
+def test_merge_state_rejects_changed_cities():
+    civ = Civilization("Рим", "Цезарь")
+    civ.add_city(City("Рим", 0, 0, civ))
+    with pytest.raises(RuntimeError):
+        civ.merge_state(Civilization("Рим", "Цезарь"))